@@ -1,4 +1,8 @@
 from GPTagger.pipelines import *
 from GPTagger.validators import *
+from GPTagger.backends import *
 from GPTagger.textractor import Textractor
 from GPTagger.indexer import Indexer
+from GPTagger.overlap import OverlapResolver, SpanIndex
+from GPTagger.usage import BudgetExceededError, UsageLedger
+from GPTagger.evaluation import Scorer, evaluate, sweep
@@ -0,0 +1,4 @@
+from GPTagger.backends.base import BaseBackend, Generation
+from GPTagger.backends.openai import OpenAIBackend
+from GPTagger.backends.replay import RecordBackend, ReplayBackend, ReplayMissError
+from GPTagger.backends.metered import MeteredBackend
@@ -0,0 +1,38 @@
+from typing import List
+from dataclasses import dataclass
+from abc import ABC, abstractmethod
+
+
+@dataclass
+class Generation:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class BaseBackend(ABC):
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+
+    @abstractmethod
+    def __call__(self, prompt: str, functions: List[dict] = None) -> Generation:
+        """request the llm with a prompt
+
+        Args:
+            prompt (str): the prompt
+            functions (List[dict], optional): openai function definitions, the model
+                is forced to call the first one. Defaults to None.
+
+        Returns:
+            Generation: the message content, or the function call arguments when
+                `functions` is given
+        """
+        pass
+
+    def fork(self) -> "BaseBackend":
+        """A backend for another pipeline, stateful backends reset their state
+
+        Returns:
+            BaseBackend: the forked backend
+        """
+        return self
@@ -0,0 +1,38 @@
+from typing import List
+
+from GPTagger.usage import UsageLedger
+from GPTagger.backends.base import BaseBackend, Generation
+
+
+class MeteredBackend(BaseBackend):
+    def __init__(
+        self,
+        backend: BaseBackend,
+        ledger: UsageLedger,
+        stage: str,
+        model_name: str = None,
+    ) -> None:
+        """Wrap a backend to enforce the budgets and record usage in a ledger
+
+        Args:
+            backend (BaseBackend): the backend doing the requests
+            ledger (UsageLedger): the usage ledger
+            stage (str): pipeline stage of the requests
+            model_name (str, optional): model the usage is recorded for. Defaults to
+                the model of the backend.
+        """
+        super().__init__(model_name or backend.model_name)
+        self.backend = backend
+        self.ledger = ledger
+        self.stage = stage
+
+    def __call__(self, prompt: str, functions: List[dict] = None) -> Generation:
+        self.ledger.check()
+        generation = self.backend(prompt, functions)
+        self.ledger.record(
+            self.model_name,
+            self.stage,
+            generation.prompt_tokens,
+            generation.completion_tokens,
+        )
+        return generation
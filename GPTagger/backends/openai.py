@@ -0,0 +1,50 @@
+from typing import List
+from langchain.llms import OpenAI
+from langchain.schema import HumanMessage
+from langchain.chat_models import ChatOpenAI
+from langchain.callbacks import get_openai_callback
+
+from GPTagger.backends.base import BaseBackend, Generation
+
+
+class OpenAIBackend(BaseBackend):
+    def __init__(
+        self, model_name: str = "gpt-3.5-turbo", max_tokens: int = 256
+    ) -> None:
+        """Backend requesting the OpenAI api through langchain
+
+        Args:
+            model_name (str, optional): the used GPT model. Defaults to "gpt-3.5-turbo".
+            max_tokens (int, optional): max length of generated token. Defaults to 256.
+        """
+        super().__init__(model_name)
+        self.type = self.get_gpt_type(model_name)
+
+        if self.type == "chat":
+            self.model = ChatOpenAI(model=model_name, max_tokens=max_tokens)
+        else:
+            self.model = OpenAI(model=model_name, max_tokens=max_tokens)
+
+    def __call__(self, prompt: str, functions: List[dict] = None) -> Generation:
+        with get_openai_callback() as cb:
+            if self.type == "comp":
+                text = self.model(prompt)
+            elif functions:
+                # The function_call param is very important to restrict the model to only call this function
+                msg = self.model.predict_messages(
+                    [HumanMessage(content=prompt)],
+                    functions=functions,
+                    function_call={"name": functions[0]["name"]},
+                )
+                text = msg.additional_kwargs["function_call"]["arguments"]
+            else:
+                msg = self.model.predict_messages([HumanMessage(content=prompt)])
+                text = msg.content
+
+        return Generation(text, cb.prompt_tokens, cb.completion_tokens)
+
+    def get_gpt_type(self, model_name: str) -> str:
+        if "gpt" in model_name:
+            return "chat"
+        else:
+            return "comp"
@@ -0,0 +1,162 @@
+import copy
+import json
+import time
+import random
+import hashlib
+import threading
+
+from pathlib import Path
+from typing import List, Union
+from dataclasses import asdict
+
+from GPTagger.backends.base import BaseBackend, Generation
+
+
+class ReplayMissError(KeyError):
+    pass
+
+
+def request_key(model_name: str, prompt: str, functions: List[dict] = None) -> str:
+    """Hash a request into the key used by the record file
+
+    Args:
+        model_name (str): the requested model
+        prompt (str): the prompt
+        functions (List[dict], optional): openai function definitions. Defaults to None.
+
+    Returns:
+        str: hex digest of the request
+    """
+    names = [f["name"] for f in functions] if functions else []
+    content = json.dumps([model_name, prompt, names], ensure_ascii=False)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class RecordBackend(BaseBackend):
+    def __init__(self, backend: BaseBackend, path: Union[Path, str]) -> None:
+        """Wrap a backend and append every request and response to a jsonl file
+
+        Args:
+            backend (BaseBackend): the backend doing the real requests
+            path (Union[Path, str]): path of the record file
+        """
+        super().__init__(backend.model_name)
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, prompt: str, functions: List[dict] = None) -> Generation:
+        generation = self.backend(prompt, functions)
+
+        record = {
+            "key": request_key(self.model_name, prompt, functions),
+            "model": self.model_name,
+            **asdict(generation),
+        }
+        with self.lock:
+            self.file.write(f"{json.dumps(record, ensure_ascii=False)}\n")
+            self.file.flush()
+
+        return generation
+
+    def close(self) -> None:
+        """Close the record file"""
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self) -> "RecordBackend":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ReplayBackend(BaseBackend):
+    def __init__(
+        self,
+        path: Union[Path, str],
+        model_name: str = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Serve responses recorded by `RecordBackend` without any network access
+
+        Repeated requests of the same prompt are served with the recorded responses
+        in order, and start over after the last one.
+
+        Args:
+            path (Union[Path, str]): path of the record file
+            model_name (str, optional): the replayed model, required when the file records
+                several models. Defaults to the recorded model.
+            latency (float, optional): simulated seconds per request. Defaults to 0.0.
+            jitter (float, optional): max random seconds added to latency. Defaults to 0.0.
+            error_rate (float, optional): probability of a simulated error. Defaults to 0.0.
+            seed (int, optional): seed of jitter and errors. Defaults to 0.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.index = {}
+        self.cursors = {}
+        models = set()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                key = record.pop("key")
+                models.add(record.pop("model"))
+                self.index.setdefault(key, []).append(Generation(**record))
+
+        if model_name is None:
+            if len(models) != 1:
+                raise ValueError(
+                    f"Record file has models {sorted(models)}, set `model_name`"
+                )
+            model_name = models.pop()
+        super().__init__(model_name)
+
+    def __call__(self, prompt: str, functions: List[dict] = None) -> Generation:
+        key = request_key(self.model_name, prompt, functions)
+        if key not in self.index:
+            raise ReplayMissError(f"No recorded response for request {key}")
+
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+            cursor = self.cursors.get(key, 0)
+            self.cursors[key] = (cursor + 1) % len(self.index[key])
+
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise RuntimeError(f"Simulated error for request {key}")
+
+        return self.index[key][cursor]
+
+    def fork(self) -> "ReplayBackend":
+        """Share the records with fresh cursors, so another pipeline replays the
+        responses from the first one
+
+        Returns:
+            ReplayBackend: the forked backend
+        """
+        backend = copy.copy(self)
+        backend.random = random.Random(self.seed)
+        backend.lock = threading.Lock()
+        backend.cursors = {}
+        return backend
+
+    def __getstate__(self) -> dict:
+        # locks cannot be pickled, e.g. when sent to a process pool
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
@@ -1,11 +1,79 @@
-model2ctxlen = {
-    "gpt-4": 8192,
-    "gpt-4-0613": 8192,
-    "gpt-4-32k": 32768,
-    "gpt-4-32k-0613": 32768,
-    "gpt-3.5-turbo": 4096,
-    "gpt-3.5-turbo-16k": 16384,
-    "gpt-3.5-turbo-0613": 4096,
-    "gpt-3.5-turbo-16k-0613": 16384,
-    "text-davinci-003": 4096,
+from dataclasses import dataclass
+
+
+@dataclass
+class ModelInfo:
+    # context length, shared by prompt and completion
+    ctx_len: int
+    # max number of completion tokens
+    max_output: int
+    # tiktoken encoding name
+    encoding: str = "cl100k_base"
+    # USD per 1k tokens
+    prompt_price: float = 0.0
+    completion_price: float = 0.0
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (
+            prompt_tokens * self.prompt_price
+            + completion_tokens * self.completion_price
+        ) / 1000
+
+
+model_registry = {
+    "gpt-4": ModelInfo(8192, 8192, prompt_price=0.03, completion_price=0.06),
+    "gpt-4-0613": ModelInfo(8192, 8192, prompt_price=0.03, completion_price=0.06),
+    "gpt-4-32k": ModelInfo(32768, 32768, prompt_price=0.06, completion_price=0.12),
+    "gpt-4-32k-0613": ModelInfo(32768, 32768, prompt_price=0.06, completion_price=0.12),
+    "gpt-4-1106-preview": ModelInfo(
+        128000, 4096, prompt_price=0.01, completion_price=0.03
+    ),
+    "gpt-4-turbo": ModelInfo(128000, 4096, prompt_price=0.01, completion_price=0.03),
+    "gpt-3.5-turbo": ModelInfo(4096, 4096, prompt_price=0.0015, completion_price=0.002),
+    "gpt-3.5-turbo-16k": ModelInfo(
+        16384, 16384, prompt_price=0.003, completion_price=0.004
+    ),
+    "gpt-3.5-turbo-0613": ModelInfo(
+        4096, 4096, prompt_price=0.0015, completion_price=0.002
+    ),
+    "gpt-3.5-turbo-16k-0613": ModelInfo(
+        16384, 16384, prompt_price=0.003, completion_price=0.004
+    ),
+    "gpt-3.5-turbo-1106": ModelInfo(
+        16385, 4096, prompt_price=0.001, completion_price=0.002
+    ),
+    "text-davinci-003": ModelInfo(
+        4096, 4096, "p50k_base", prompt_price=0.02, completion_price=0.02
+    ),
 }
+
+
+def register_model(name: str, info: ModelInfo):
+    """Register a model, e.g. a newer or a local one
+
+    Args:
+        name (str): model name
+        info (ModelInfo): model metadata
+    """
+    model_registry[name] = info
+
+
+def get_model_info(name: str) -> ModelInfo:
+    """Get the metadata of a model, dated variants fall back to the longest
+    registered prefix, e.g. gpt-4-0314 to gpt-4
+
+    Args:
+        name (str): model name
+
+    Returns:
+        ModelInfo: model metadata
+    """
+    if name in model_registry:
+        return model_registry[name]
+
+    prefixes = [k for k in model_registry if name.startswith(f"{k}-")]
+    if not prefixes:
+        raise ValueError(
+            f"Unsupported model name {name}, register it with `register_model`"
+        )
+    return model_registry[max(prefixes, key=len)]
@@ -0,0 +1,239 @@
+import json
+import xml.etree.ElementTree as ET
+
+from pathlib import Path
+from collections import defaultdict
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+from langchain.prompts import PromptTemplate
+
+from GPTagger.tag import Tag
+from GPTagger.logger import log2cons
+from GPTagger.overlap import SpanIndex
+from GPTagger.backends import BaseBackend
+from GPTagger.validators import BaseValidator
+from GPTagger.pipelines import NerConfig, NerPipeline
+
+
+def load_xml(path: Union[Path, str]) -> Tuple[str, str, List[Tag]]:
+    """Load a document annotated in the format written by `NerPipeline._export`
+
+    Args:
+        path (Union[Path, str]): path of the xml file
+
+    Returns:
+        Tuple[str, str, List[Tag]]: file name, text and gold tags
+    """
+    root = ET.parse(path).getroot()
+
+    text = root.text or ""
+    tags = []
+    for element in root:
+        start = len(text)
+        text += element.text or ""
+        tags.append(Tag(start, len(text), element.text or "", element.tag))
+        text += element.tail or ""
+
+    return root.get("id", Path(path).name), text, tags
+
+
+def iter_gold(path: Union[Path, str]) -> Iterator[Tuple[str, str, List[Tag]]]:
+    """Iterate over gold documents one by one
+
+    A directory is read as xml files, hidden and invalid files are skipped, otherwise the path is read as jsonl where each
+    line is {"fname": str, "text": str, "tags": [{"start", "end", "label"}]}.
+
+    Args:
+        path (Union[Path, str]): directory of xml files or jsonl file
+
+    Yields:
+        Iterator[Tuple[str, str, List[Tag]]]: file name, text and gold tags
+    """
+    path = Path(path)
+
+    if path.is_dir():
+        for xml_path in sorted(path.iterdir()):
+            # skip hidden files like .DS_Store
+            if not xml_path.is_file() or xml_path.name.startswith("."):
+                continue
+            try:
+                doc = load_xml(xml_path)
+            except ET.ParseError as e:
+                log2cons.warning("Skip %s, it is not a valid xml file: %s", xml_path, e)
+                continue
+            yield doc
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            doc = json.loads(line)
+            text = doc["text"]
+            tags = [
+                Tag(t["start"], t["end"], text[t["start"] : t["end"]], t["label"])
+                for t in doc["tags"]
+            ]
+            yield doc.get("fname"), text, tags
+
+
+def prf(tp_pred: int, tp_gold: int, nr_pred: int, nr_gold: int) -> Dict[str, float]:
+    precision = tp_pred / nr_pred if nr_pred else 0.0
+    recall = tp_gold / nr_gold if nr_gold else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+class Scorer:
+    def __init__(self) -> None:
+        """Accumulate exact and partial span matching counts per label
+
+        Only counts are kept, so documents can be scored one by one. A partial match
+        is an overlapping span with the same label.
+        """
+        self.counts = defaultdict(lambda: defaultdict(int))
+
+    def update(self, gold: List[Tag], pred: List[Tag]):
+        index = SpanIndex()
+        for tag in gold:
+            index.add(tag)
+
+        exact = {(t.start, t.end, t.label) for t in gold}
+        gold_partial = set()
+
+        for tag in pred:
+            counts = self.counts[tag.label]
+            counts["nr_pred"] += 1
+            if (tag.start, tag.end, tag.label) in exact:
+                counts["tp_exact"] += 1
+            overlaps = [
+                t for t in index.overlap(tag.start, tag.end) if t.label == tag.label
+            ]
+            if overlaps:
+                counts["tp_partial_pred"] += 1
+                gold_partial.update(id(t) for t in overlaps)
+
+        for tag in gold:
+            counts = self.counts[tag.label]
+            counts["nr_gold"] += 1
+            if id(tag) in gold_partial:
+                counts["tp_partial_gold"] += 1
+
+    def report(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """P/R/F1 of exact and partial matching per label, and micro averaged in "all"
+
+        Returns:
+            Dict[str, Dict[str, Dict[str, float]]]: label -> exact/partial -> metrics
+        """
+        total = defaultdict(int)
+        for counts in self.counts.values():
+            for k, v in counts.items():
+                total[k] += v
+
+        report = {}
+        for label, counts in [*self.counts.items(), ("all", total)]:
+            report[label] = {
+                "exact": prf(
+                    counts["tp_exact"],
+                    counts["tp_exact"],
+                    counts["nr_pred"],
+                    counts["nr_gold"],
+                ),
+                "partial": prf(
+                    counts["tp_partial_pred"],
+                    counts["tp_partial_gold"],
+                    counts["nr_pred"],
+                    counts["nr_gold"],
+                ),
+            }
+
+        return report
+
+
+def evaluate(
+    pipeline: NerPipeline, template: PromptTemplate, gold_path: Union[Path, str]
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Score a pipeline against gold annotations
+
+    Args:
+        pipeline (NerPipeline): the pipeline
+        template (PromptTemplate): prompt template with {text} placeholder
+        gold_path (Union[Path, str]): directory of xml files or jsonl file
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]: report of `Scorer`
+    """
+    scorer = Scorer()
+    for fname, text, gold in iter_gold(gold_path):
+        # only score the label of the pipeline
+        gold = [tag for tag in gold if tag.label == pipeline.tag_name]
+        scorer.update(gold, pipeline(text, template, fname))
+
+    return scorer.report()
+
+
+def _evaluate_config(
+    config: NerConfig,
+    validators: Callable[[NerConfig, BaseBackend], List[BaseValidator]],
+    template: PromptTemplate,
+    gold_path: Union[Path, str],
+    kwargs: Dict,
+) -> Dict:
+    # each pipeline replays the recorded responses from the first one
+    if kwargs.get("backend"):
+        kwargs = {**kwargs, "backend": kwargs["backend"].fork()}
+    pipeline = NerPipeline.from_config(config, **kwargs)
+    if validators:
+        for validator in validators(config, kwargs.get("backend")):
+            pipeline.add_validator(validator)
+
+    return evaluate(pipeline, template, gold_path)
+
+
+def sweep(
+    configs: List[NerConfig],
+    template: PromptTemplate,
+    gold_path: Union[Path, str],
+    num_workers: int = 4,
+    validators: Union[Callable, List[Callable]] = None,
+    processes: bool = False,
+    **kwargs,
+) -> List[Tuple[NerConfig, Dict]]:
+    """Evaluate pipeline configs in parallel, e.g. different indexer thresholds
+
+    Pass a `ReplayBackend` in kwargs to serve cached responses to all configs, each
+    pipeline gets a fork of it so every config replays the same responses. Validators
+    are built per config by `validators(config, backend)` with the forked backend,
+    give a list of factories to sweep validator settings such as `GPTValidator`
+    models or `LocalClassifierValidator` margins.
+
+    Threads only help when requests take time, e.g. real requests or a `ReplayBackend`
+    with latency. Replayed responses leave the CPU bound fuzzy matching, set
+    `processes` to run the configs in a process pool, then kwargs and validator
+    factories have to be picklable, e.g. module level functions and no ledger.
+
+    Args:
+        configs (List[NerConfig]): list of configs
+        template (PromptTemplate): prompt template with {text} placeholder
+        gold_path (Union[Path, str]): directory of xml files or jsonl file
+        num_workers (int, optional): number of threads or processes. Defaults to 4.
+        validators (Union[Callable, List[Callable]], optional): factory returning the validators of a config given the config and the pipeline backend, or a factory per config. Defaults to None.
+        processes (bool, optional): use a process pool instead of threads. Defaults to False.
+
+    Returns:
+        List[Tuple[NerConfig, Dict]]: each config with its report
+    """
+    if validators is None or callable(validators):
+        validators = [validators] * len(configs)
+    if len(validators) != len(configs):
+        raise ValueError(
+            f"Got {len(validators)} validator factories for {len(configs)} configs"
+        )
+
+    run = partial(
+        _evaluate_config, template=template, gold_path=gold_path, kwargs=kwargs
+    )
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool(num_workers) as executor:
+        reports = list(executor.map(run, configs, validators))
+
+    return list(zip(configs, reports))
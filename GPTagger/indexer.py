@@ -1,17 +1,10 @@
-import re
-
-from typing import List
+from typing import Dict, List, Union
 from fuzzywuzzy import fuzz
-from dataclasses import dataclass
 
+from GPTagger.tag import Tag
 from GPTagger.logger import log2file
-
-
-@dataclass
-class Tag:
-    start: int
-    end: int
-    text: str
+from GPTagger.overlap import OverlapResolver
+from GPTagger.tokenizers import BaseTokenizer, Token, get_tokenizer
 
 
 class Indexer:
@@ -19,17 +12,38 @@ class Indexer:
         self,
         token_threshold: int = 80,
         phrase_threshold: int = 80,
+        overlap_policy: str = "shortest",
+        priorities: Dict[str, int] = None,
+        by_label: bool = False,
+        tokenizer: Union[str, BaseTokenizer] = "whitespace",
+        window_slack: int = 0,
+        max_window: int = 256,
     ) -> None:
         """Indexer can find the location of queries in the document
 
         Args:
             token_threshold (int, optional): first and last token matching threshold. Defaults to 80.
             phrase_threshold (int, optional): query and phrase matching threshold. Defaults to 80.
+            overlap_policy (str, optional): policy used to resolve overlapping. Defaults to "shortest".
+            priorities (Dict[str, int], optional): priority of each tag label for the priority policy. Defaults to None.
+            by_label (bool, optional): only resolve overlapping among tags of the same label. Defaults to False.
+            tokenizer (Union[str, BaseTokenizer], optional): one of [whitespace, regex, char, cjk] or a tokenizer, use cjk or char for unspaced text. Defaults to "whitespace".
+            window_slack (int, optional): phrases can have up to this number of tokens more or less than the query. Defaults to 0.
+            max_window (int, optional): max number of tokens of a phrase, longer queries are not indexed. Defaults to 256.
         """
         self.token_threshold = token_threshold
         self.phrase_threshold = phrase_threshold
+        self.resolver = OverlapResolver(overlap_policy, priorities, by_label)
 
-    def _find_similar_phrase(self, tokens_q: List[str], tokens_d: List[str]) -> str:
+        if isinstance(tokenizer, str):
+            tokenizer = get_tokenizer(tokenizer)
+        self.tokenizer = tokenizer
+        self.window_slack = window_slack
+        self.max_window = max_window
+
+    def _find_similar_phrase(
+        self, tokens_q: List[str], tokens_d: List[str]
+    ) -> List[str]:
         """Find the most similar phrase in the document given a query using fuzzy
 
         Args:
@@ -37,74 +51,138 @@ class Indexer:
             tokens_d (List[str]): list of document tokens
 
         Returns:
-            str: the most similar phrase
+            List[str]: tokens of the most similar phrase
         """
         max_ratio = 0
         similar_phrase = None
-        for i in range(len(tokens_d) - len(tokens_q) + 1):
+
+        sep = self.tokenizer.sep
+        text_q = sep.join(tokens_q)
+        token_q_first, token_q_last = tokens_q[0], tokens_q[-1]
+        # window sizes, the closest to the query first
+        sizes = [len(tokens_q)]
+        for slack in range(1, self.window_slack + 1):
+            sizes.extend([len(tokens_q) - slack, len(tokens_q) + slack])
+        sizes = [n for n in sizes if 0 < n <= self.max_window]
+
+        # documents repeat tokens, especially characters, so cache token matching
+        matched_first, matched_last = {}, {}
+
+        for i in range(len(tokens_d)):
             token_orig_first = tokens_d[i]
-            token_orig_last = tokens_d[i + len(tokens_q) - 1]
-
-            # either the first or the last token is matched
-            if (
-                token_orig_first == tokens_q[0]
-                or token_orig_last == tokens_q[-1]
-                or fuzz.ratio(token_orig_first, tokens_q[0]) > self.token_threshold
-                or fuzz.ratio(token_orig_last, tokens_q[-1]) > self.token_threshold
-            ):
-                text_q = " ".join(tokens_q)
-                text_o = " ".join(tokens_d[i : i + len(tokens_q)])
-                ratio = fuzz.ratio(text_o, text_q)
-                if ratio >= self.phrase_threshold:
-                    if ratio > max_ratio:
-                        similar_phrase = text_o
-                        max_ratio = ratio
+            if token_orig_first not in matched_first:
+                matched_first[token_orig_first] = (
+                    token_orig_first == token_q_first
+                    or fuzz.ratio(token_orig_first, token_q_first)
+                    > self.token_threshold
+                )
+
+            for n in sizes:
+                if i + n > len(tokens_d):
+                    continue
+                token_orig_last = tokens_d[i + n - 1]
+                if token_orig_last not in matched_last:
+                    matched_last[token_orig_last] = (
+                        token_orig_last == token_q_last
+                        or fuzz.ratio(token_orig_last, token_q_last)
+                        > self.token_threshold
+                    )
+
+                # either the first or the last token is matched
+                if matched_first[token_orig_first] or matched_last[token_orig_last]:
+                    text_o = sep.join(tokens_d[i : i + n])
+                    ratio = fuzz.ratio(text_o, text_q)
+                    if ratio >= self.phrase_threshold:
+                        if ratio > max_ratio:
+                            similar_phrase = tokens_d[i : i + n]
+                            max_ratio = ratio
 
         return similar_phrase
 
-    def _find_phrase_location(self, query: str, phrase: str, doc: str) -> List[Tag]:
-        """Find the location of the most similar phrase in the document using regex
+    def _find_phrase_location(
+        self,
+        query: str,
+        phrase: List[str],
+        tokens_d: List[Token],
+        doc: str,
+        label: str = None,
+        votes: int = 1,
+        num_of_calls: int = 1,
+    ) -> List[Tag]:
+        """Find the location of the most similar phrase in the document using token offsets
 
         Args:
             query (str): the query text, used for double validation
-            phrase (str): the phrase text
+            phrase (List[str]): tokens of the phrase
+            tokens_d (List[Token]): document tokens with their offsets
             doc (str): the document text
+            label (str, optional): label of the tags. Defaults to None.
+            votes (int, optional): number of calls agreeing on the query. Defaults to 1.
+            num_of_calls (int, optional): number of calls behind the votes. Defaults to 1.
 
         Returns:
             List[Tag]: list of tag with position and text
         """
         tags = []
 
-        regex = r"\s+".join([re.escape(w) for w in phrase.split()])
-
-        # re.S makes dot can match anything including newline
-        for match in re.finditer(regex, doc, flags=re.S):
+        n = len(phrase)
+        for i in range(len(tokens_d) - n + 1):
+            if tokens_d[i].text != phrase[0]:
+                continue
+            if [token.text for token in tokens_d[i : i + n]] != phrase:
+                continue
+            # the span keeps the original gaps between tokens
+            start, end = tokens_d[i].start, tokens_d[i + n - 1].end
+            text = doc[start:end]
             # filter out bad matching
-            if fuzz.ratio(match.group(), query) > self.phrase_threshold:
-                text = match.group()
-                tags.append(Tag(match.start(), match.end(), text))
+            ratio = fuzz.ratio(text, query)
+            if ratio > self.phrase_threshold:
+                score = votes / num_of_calls * ratio / 100
+                tags.append(Tag(start, end, text, label, votes, ratio, score))
 
         return tags
 
-    def index(self, queries: List[str], doc: str, fname: str = None) -> List[Tag]:
+    def index(
+        self,
+        queries: Union[List[str], Dict[str, int]],
+        doc: str,
+        fname: str = None,
+        label: str = None,
+        num_of_calls: int = None,
+    ) -> List[Tag]:
         """Batch call _index(query)
 
         Args:
-            queries (List[str]): list of query text
+            queries (Union[List[str], Dict[str, int]]): list of query text, or query text with their votes
             doc (str): document text
             fname (str, optional): document file name, used for logging. Defaults to None.
+            label (str, optional): label of the tags. Defaults to None.
+            num_of_calls (int, optional): number of calls behind the votes, tags are scored by votes / num_of_calls * ratio / 100. Defaults to the highest votes.
 
         Returns:
             List[Tag]: list of tag with positions and text
         """
         tags = []
-        tokens_d = doc.split()
+        if num_of_calls is None:
+            num_of_calls = (
+                max(queries.values(), default=1) if isinstance(queries, dict) else 1
+            )
+        tokens_d = self.tokenizer(doc)
+        texts_d = [token.text for token in tokens_d]
 
         for query in queries:
-            tokens_q = query.split()
-            phrase = self._find_similar_phrase(tokens_q, tokens_d)
+            tokens_q = [token.text for token in self.tokenizer(query)]
+            if not tokens_q or len(tokens_q) > self.max_window:
+                phrase = None
+            else:
+                phrase = self._find_similar_phrase(tokens_q, texts_d)
             if phrase:
-                tags.extend(self._find_phrase_location(query, phrase, doc))
+                votes = queries[query] if isinstance(queries, dict) else 1
+                tags.extend(
+                    self._find_phrase_location(
+                        query, phrase, tokens_d, doc, label, votes, num_of_calls
+                    )
+                )
             else:
                 log = {"filter_name": "Indexer", "text": query, "fname": fname}
                 log2file.info(log)
@@ -123,44 +201,4 @@ class Indexer:
         Returns:
             List[Tag]: list of tags without overlapping
         """
-
-        if not tags:
-            return []
-
-        tags = sorted(tags, key=lambda x: x.end)
-
-        ptr = 0
-        tags_wo_overlap = []
-        while ptr < len(tags):
-            tags_overlap = [tags[ptr]]
-            ptr += 1
-
-            # overlapping exists
-            while ptr < len(tags) and tags[ptr].start < tags_overlap[0].end:
-                tags_overlap.append(tags[ptr])
-                ptr += 1
-
-            # by default only save the shortest extraction
-            min_len = tags_overlap[0].end - tags_overlap[0].start
-            min_index = 0
-
-            for i, tag in enumerate(tags_overlap[1:]):
-                if tag.end - tag.start < min_len:
-                    # exclude old one
-                    min_len, min_index = tag.end - tag.start, i + 1
-
-            # logging
-            for i, tag in enumerate(tags_overlap):
-                if i == min_index:
-                    continue
-                log = {
-                    "filter_name": "overlapping",
-                    "text": tag.text,
-                    "fname": fname,
-                }
-                log2file.info(log)
-
-            # add to no overlap
-            tags_wo_overlap.append(tags_overlap[min_index])
-
-        return tags_wo_overlap
+        return self.resolver(tags, fname)
@@ -0,0 +1,214 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List
+
+from GPTagger.tag import Tag
+from GPTagger.logger import log2file
+
+
+class SpanIndex:
+    def __init__(self, load: int = 512) -> None:
+        """Sorted index of tags supporting incremental insertion and overlap queries
+
+        Tags are kept sorted by start in buckets of bounded size, so an insertion
+        only shifts one bucket. Each bucket keeps its max end and longest tag, and a
+        max tree over the buckets finds the buckets reaching a query in O(log n), so
+        a long tag only slows down the queries it actually overlaps.
+
+        Args:
+            load (int, optional): bucket size before splitting. Defaults to 512.
+        """
+        self.load = load
+        self.heads = []
+        self.starts = []
+        self.buckets = []
+        # max end and longest tag of each bucket
+        self.max_ends = []
+        self.max_lens = []
+        self.size = 0
+        self._build()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _build(self):
+        self.leaves = 1
+        while self.leaves < len(self.buckets):
+            self.leaves *= 2
+        self.tree = [float("-inf")] * (2 * self.leaves)
+        self.tree[self.leaves : self.leaves + len(self.buckets)] = self.max_ends
+        for i in range(self.leaves - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def _update(self, b: int):
+        # max ends only grow on insertion, stop once an ancestor covers it
+        i, end = b + self.leaves, self.max_ends[b]
+        self.tree[i] = end
+        i //= 2
+        while i and self.tree[i] < end:
+            self.tree[i] = end
+            i //= 2
+
+    def add(self, tag: Tag):
+        self.size += 1
+
+        if not self.buckets:
+            self.heads.append(tag.start)
+            self.starts.append([tag.start])
+            self.buckets.append([tag])
+            self.max_ends.append(tag.end)
+            self.max_lens.append(tag.end - tag.start)
+            self._build()
+            return
+
+        b = max(bisect_right(self.heads, tag.start) - 1, 0)
+        starts, bucket = self.starts[b], self.buckets[b]
+        i = bisect_right(starts, tag.start)
+        starts.insert(i, tag.start)
+        bucket.insert(i, tag)
+        self.heads[b] = starts[0]
+        if tag.end - tag.start > self.max_lens[b]:
+            self.max_lens[b] = tag.end - tag.start
+
+        if len(bucket) <= 2 * self.load:
+            if tag.end > self.max_ends[b]:
+                self.max_ends[b] = tag.end
+                self._update(b)
+            return
+
+        # split the bucket in halves when it is full
+        self.heads.insert(b + 1, starts[self.load])
+        self.starts.insert(b + 1, starts[self.load :])
+        self.buckets.insert(b + 1, bucket[self.load :])
+        del starts[self.load :], bucket[self.load :]
+        halves = self.buckets[b : b + 2]
+        self.max_ends[b : b + 1] = [max(t.end for t in h) for h in halves]
+        self.max_lens[b : b + 1] = [max(t.end - t.start for t in h) for h in halves]
+        self._build()
+
+    def _prev(self, b: int, start: int) -> int:
+        """The last bucket before b with tags ending after start, -1 if none"""
+        i = b + self.leaves
+        while i > 1:
+            # the left sibling covers the buckets right before
+            if i % 2 and self.tree[i - 1] > start:
+                i -= 1
+                while i < self.leaves:
+                    i = 2 * i + 1 if self.tree[2 * i + 1] > start else 2 * i
+                return i - self.leaves
+            i //= 2
+        return -1
+
+    def _overlap(self, start: int, end: int) -> Iterator[Tag]:
+        """Overlapping tags, from the bucket closest to the span backwards"""
+        b = bisect_left(self.heads, end) - 1
+        # most overlapping tags are in the closest bucket
+        if b >= 0 and self.max_ends[b] <= start:
+            b = self._prev(b, start)
+
+        while b >= 0:
+            starts, bucket = self.starts[b], self.buckets[b]
+            i = bisect_right(starts, start - self.max_lens[b])
+            j = bisect_left(starts, end)
+            for tag in bucket[i:j]:
+                if tag.end > start:
+                    yield tag
+            b = self._prev(b, start)
+
+    def overlap(self, start: int, end: int) -> List[Tag]:
+        """Find the tags overlapping with the span [start, end)
+
+        Args:
+            start (int): start of the span
+            end (int): end of the span
+
+        Returns:
+            List[Tag]: list of overlapping tags sorted by start
+        """
+        return sorted(self._overlap(start, end), key=lambda x: x.start)
+
+    def has_overlap(self, start: int, end: int) -> bool:
+        """Check if any tag overlaps with the span [start, end), stops at the first one
+
+        Args:
+            start (int): start of the span
+            end (int): end of the span
+
+        Returns:
+            bool: overlapping or not
+        """
+        return next(self._overlap(start, end), None) is not None
+
+
+class OverlapResolver:
+    policies = ["shortest", "longest", "confidence", "priority"]
+
+    def __init__(
+        self,
+        policy: str = "shortest",
+        priorities: Dict[str, int] = None,
+        by_label: bool = False,
+    ) -> None:
+        """OverlapResolver keeps the best tags without overlapping from a list of tags
+
+        Tags are visited from the best to the worst according to the policy, and a
+        tag is kept when it does not overlap any kept tag.
+
+        Args:
+            policy (str, optional): one of [shortest, longest, confidence, priority].
+                Defaults to "shortest".
+            priorities (Dict[str, int], optional): priority of each tag label, lower
+                is better, required by the priority policy. Defaults to None.
+            by_label (bool, optional): only resolve overlapping among tags of the same
+                label. Defaults to False.
+        """
+        if policy not in self.policies:
+            raise ValueError(
+                f"{policy} not support, supported policies are {self.policies}"
+            )
+        if policy == "priority" and not priorities:
+            raise ValueError("`priorities` should not be None for priority policy")
+
+        self.policy = policy
+        self.priorities = priorities
+        self.by_label = by_label
+
+    def _rank(self, tag: Tag) -> tuple:
+        length = tag.end - tag.start
+        if self.policy == "shortest":
+            return (length, tag.start)
+        if self.policy == "longest":
+            return (-length, tag.start)
+        if self.policy == "confidence":
+            return (-tag.score, length, tag.start)
+        # unknown labels come last
+        priority = self.priorities.get(tag.label, float("inf"))
+        return (priority, length, tag.start)
+
+    def __call__(self, tags: List[Tag], fname: str = None) -> List[Tag]:
+        """Giving a list of Tags of a document, resolve overlapping issue among them
+
+        Args:
+            tags (List[Tag]): list of tags
+            fname (str, optional): document file name, used for logging. Defaults to None.
+
+        Returns:
+            List[Tag]: list of tags without overlapping sorted by start
+        """
+        indices = {}
+        tags_wo_overlap = []
+
+        for tag in sorted(tags, key=self._rank):
+            key = tag.label if self.by_label else None
+            if key not in indices:
+                indices[key] = SpanIndex()
+            index = indices[key]
+
+            if index.has_overlap(tag.start, tag.end):
+                log = {"filter_name": "overlapping", "text": tag.text, "fname": fname}
+                log2file.info(log)
+                continue
+
+            index.add(tag)
+            tags_wo_overlap.append(tag)
+
+        return sorted(tags_wo_overlap, key=lambda x: x.start)
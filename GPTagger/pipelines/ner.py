@@ -2,11 +2,13 @@ import json
 import xml.etree.ElementTree as ET
 
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, List, Union
 from dataclasses import dataclass
 from langchain.prompts import PromptTemplate
 
 from GPTagger.validators import *
+from GPTagger.usage import UsageLedger
+from GPTagger.backends import BaseBackend
 from GPTagger.indexer import Indexer, Tag
 from GPTagger.textractor import Textractor
 from GPTagger.logger import log2cons, log2file, setup_log2file
@@ -22,9 +24,16 @@ class NerConfig:
     # indexer cfgs
     token_threshold: int = 80
     phrase_threshold: int = 85
+    overlap_policy: str = "shortest"
+    priorities: Dict[str, int] = None
+    by_label: bool = False
+    tokenizer: str = "whitespace"
+    window_slack: int = 0
+    max_window: int = 256
     # validator cfgs
     tag_regex: str = None
     tag_max_len: int = 128
+    accept_threshold: float = None
     # paths
     log_dir: Path = None
     export_dir: Path = None
@@ -43,22 +52,45 @@ class NerPipeline:
         model: str = "gpt-3.5-turbo",
         token_threshold: int = 80,
         phrase_threshold: int = 85,
+        overlap_policy: str = "shortest",
+        priorities: Dict[str, int] = None,
+        by_label: bool = False,
+        tokenizer: str = "whitespace",
+        window_slack: int = 0,
+        max_window: int = 256,
         tag_regex: str = None,
         tag_max_len: int = None,
+        accept_threshold: float = None,
         log_dir: Union[Path, str] = None,
         export_dir: Union[Path, str] = None,
+        backend: BaseBackend = None,
+        ledger: UsageLedger = None,
     ) -> None:
         log2cons.info("NER pipeline for <%s> recognition", tag_name)
         self.tag_name = tag_name
-        self.export_dir = export_dir
+        self.export_dir = Path(export_dir) if export_dir else None
+        # confident tags skip costly validators
+        self.accept_threshold = accept_threshold
+        self.ledger = ledger
 
         self.textractor = Textractor(
             model=model,
             use_tool=use_tool,
             num_of_calls=nr_calls,
+            backend=backend,
+            ledger=ledger,
         )
 
-        self.indexer = Indexer(token_threshold, phrase_threshold)
+        self.indexer = Indexer(
+            token_threshold,
+            phrase_threshold,
+            overlap_policy=overlap_policy,
+            priorities=priorities,
+            by_label=by_label,
+            tokenizer=tokenizer,
+            window_slack=window_slack,
+            max_window=max_window,
+        )
 
         self.validators = []
         if tag_max_len:
@@ -72,16 +104,30 @@ class NerPipeline:
             setup_log2file(log_dir / f"filter.log")
 
     @classmethod
-    def from_config(cls, config: NerConfig) -> "NerPipeline":
-        return cls(**config.__dict__)
+    def from_config(cls, config: NerConfig, **kwargs) -> "NerPipeline":
+        return cls(**config.__dict__, **kwargs)
 
     def add_validator(self, validator: BaseValidator):
         self.validators.append(validator)
 
-    def __call__(self, text: str, template: PromptTemplate, fname: str = None) -> List[Tag]:
+    def __call__(
+        self,
+        text: str,
+        template: PromptTemplate,
+        fname: str = None,
+        tenant: str = None,
+    ) -> List[Tag]:
+        if self.ledger:
+            with self.ledger.track(document=fname, tenant=tenant):
+                return self._run(text, template, fname)
+        return self._run(text, template, fname)
+
+    def _run(self, text: str, template: PromptTemplate, fname: str = None) -> List[Tag]:
         # Step 1. Extraction
         extractions = self.textractor(text, template)
-        tags = self.indexer.index(extractions, text, fname)
+        tags = self.indexer.index(
+            extractions, text, fname, self.tag_name, self.textractor.num_of_calls
+        )
         log2cons.info("Extract %d <%s> tags.", len(tags), self.tag_name)
         # Step 2. Validation
         tags = self._validate(tags, fname)
@@ -95,23 +141,32 @@ class NerPipeline:
         if not tags:
             return []
 
-        tags_filtered = []
+        tags_filtered = tags
 
-        for tag in tags:
-            flag = True
-            for validator in self.validators:
-                if not validator(tag.text):
+        # validate tags in batch, validator by validator
+        for validator in self.validators:
+            tags_batch = [
+                tag
+                for tag in tags_filtered
+                if not (validator.costly and self._is_confident(tag))
+            ]
+            results = validator.batch([tag.text for tag in tags_batch])
+
+            tags_rejected = set()
+            for tag, result in zip(tags_batch, results):
+                if not result:
                     # extraction is not validated
-                    flag = False
+                    tags_rejected.add(id(tag))
                     log = {
                         "filter_name": type(validator).__name__,
                         "text": tag.text,
                         "fname": fname,
                     }
                     log2file.info(f"{json.dumps(log, ensure_ascii=False)}")
-                    break
-            if flag:
-                tags_filtered.append(tag)
+
+            tags_filtered = [
+                tag for tag in tags_filtered if id(tag) not in tags_rejected
+            ]
 
         if len(tags_filtered) <= 1:
             return tags_filtered
@@ -121,7 +176,11 @@ class NerPipeline:
 
         return tags_wo_overlap
 
-    # TODO add test for exporting
+    def _is_confident(self, tag: Tag) -> bool:
+        if self.accept_threshold is None:
+            return False
+        return tag.score >= self.accept_threshold
+
     def _export(self, text: str, tags: List[Tag], fname: str):
         if not self.export_dir:
             return
@@ -139,7 +198,7 @@ class NerPipeline:
                 next = len(text)
             else:
                 next = tags[i + 1].start
-            if not root.text:
+            if root.text is None:
                 root.text = text[: tag.start]
             element = ET.SubElement(root, self.tag_name, id=str(i))
             element.text = tag.text
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Tag:
+    start: int
+    end: int
+    text: str
+    # tag type, e.g. the tag name of the pipeline
+    label: str = None
+    # number of calls agreeing on the extraction
+    votes: int = 1
+    # fuzzy matching ratio between the extraction and the text
+    ratio: int = 100
+    score: float = 1.0
@@ -1,16 +1,21 @@
 import json
 import tiktoken
 
-from typing import List
+from typing import Dict, List
+from collections import Counter
 from pydantic import BaseModel, Field
-from langchain.schema import HumanMessage
 from langchain.prompts import PromptTemplate
-from langchain.chat_models import ChatOpenAI
-from langchain.callbacks import get_openai_callback
 from langchain.tools import format_tool_to_openai_function, tool
 
 from GPTagger.logger import log2cons
-from GPTagger.constants import model2ctxlen
+from GPTagger.constants import get_model_info
+from GPTagger.usage import BudgetExceededError, UsageLedger
+from GPTagger.backends import (
+    BaseBackend,
+    MeteredBackend,
+    OpenAIBackend,
+    ReplayMissError,
+)
 
 
 # The schema seems to be very important
@@ -35,6 +40,9 @@ class Textractor:
         num_of_calls: int = 1,
         use_tool: bool = True,
         max_new_tokens: int = 256,
+        backend: BaseBackend = None,
+        ledger: UsageLedger = None,
+        encoder: tiktoken.Encoding = None,
     ):
         """Textractor request gpt to get extractions
 
@@ -43,18 +51,68 @@ class Textractor:
             num_of_calls (int, optional): number of calls. Defaults to 1.
             use_tool (bool, optional): use functional call feature or not. Defaults to True.
             max_new_tokens (int, optional): max length of generated token. Defaults to 256.
-
+            backend (BaseBackend, optional): backend serving the requests. Defaults to
+                an `OpenAIBackend` of `model`.
+            ledger (UsageLedger, optional): ledger recording usage and enforcing budgets. Defaults to None.
+            encoder (tiktoken.Encoding, optional): encoder used to truncate prompts. Defaults to
+                the encoding of `model`, loaded on the first request.
         """
-        if model not in model2ctxlen:
-            raise ValueError(f"Unsupported model name {model}")
+        info = get_model_info(model)
+        if max_new_tokens > info.max_output:
+            raise ValueError(
+                f"max_new_tokens {max_new_tokens} exceed the output limit of"
+                f" {info.max_output}"
+            )
+        if info.ctx_len - max_new_tokens - 10 <= 0:
+            raise ValueError(
+                f"max_new_tokens {max_new_tokens} leave no room for a prompt in the"
+                f" context of {info.ctx_len}"
+            )
         # model setup
         self.use_tool = use_tool
         self.num_of_calls = num_of_calls
-        self.limit = model2ctxlen[model]
-        self.model = ChatOpenAI(model=model, max_tokens=max_new_tokens)
+        self.function = format_tool_to_openai_function(process_extractions)
+        self.model = backend or OpenAIBackend(model, max_new_tokens)
+        if ledger:
+            self.model = MeteredBackend(self.model, ledger, "extraction", model)
         # estimate token usage
         self.tkctr = 0
-        self.encoder = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        self.encoding = info.encoding
+        self._encoder = encoder
+        self._limit = None
+        # prompt budget is the context left by completion and function definition
+        self.ctx_len = info.ctx_len - max_new_tokens
+        if encoder is not None:
+            # check the function definition fits
+            self.limit
+
+    @property
+    def encoder(self) -> tiktoken.Encoding:
+        # tiktoken downloads the encoding, so don't load it before it is needed
+        if self._encoder is None:
+            try:
+                self._encoder = tiktoken.get_encoding(self.encoding)
+            except Exception:
+                log2cons.warning(
+                    "Cannot load encoding %s, prompts are not truncated", self.encoding
+                )
+                self._encoder = False
+        return self._encoder or None
+
+    @property
+    def limit(self) -> int:
+        if self._limit is None:
+            limit = self.ctx_len
+            if self.use_tool and self.encoder:
+                limit -= len(self.encoder.encode(json.dumps(self.function)))
+            # truncated prompts keep 10 tokens spare
+            if limit - 10 <= 0:
+                raise ValueError(
+                    f"The function definition leaves no room for a prompt in the"
+                    f" context of {self.ctx_len} tokens"
+                )
+            self._limit = max(limit, 0)
+        return self._limit
 
     def _request(self, prompt: str) -> List[str]:
         """request GPT with a prompt and get a list of extractions
@@ -66,61 +124,54 @@ class Textractor:
             List[str]: list of extractions
         """
         if self.use_tool:
-            # The function_call param is very important to restrict the model to only call this function
-            msg = self.model.predict_messages(
-                [HumanMessage(content=prompt)],
-                functions=[format_tool_to_openai_function(process_extractions)],
-                function_call={"name": "process_extractions"},
-            )
-            function_call = msg.additional_kwargs["function_call"]
-            texts = json.loads(function_call["arguments"])["texts"]
+            generation = self.model(prompt, functions=[self.function])
+            texts = json.loads(generation.text)["texts"]
             if isinstance(texts, str):
                 texts = texts.split("\n")
         else:
             # Either the content is json or it should be multiple line content
-            msg = self.model.predict_messages([HumanMessage(content=prompt)])
+            generation = self.model(prompt)
             try:
-                texts = json.loads(msg.content)["texts"]
+                texts = json.loads(generation.text)["texts"]
                 if isinstance(texts, str):
                     texts = texts.split("\n")
             except:
-                texts = msg.content.split("\n")
+                texts = generation.text.split("\n")
+        self.tkctr += generation.prompt_tokens + generation.completion_tokens
 
         return texts
 
-    def request(self, prompt: str) -> List[str]:
+    def request(self, prompt: str) -> Dict[str, int]:
         """request GPT, call multiple times based on `nr_calls`
 
         Args:
             prompt (str): the prompt
 
         Returns:
-            List[str]: list of extractions
+            Dict[str, int]: extractions with the number of calls agreeing on them
         """
-        tks = self.encoder.encode(prompt)
+        tks = self.encoder.encode(prompt) if self.encoder else []
         # Reach limit of llm
         if len(tks) > self.limit:
             prompt = self.encoder.decode(tks[: self.limit - 10]) + '\n"""'
-            log2cons.warn(
+            log2cons.warning(
                 f"Current prompt has length {len(tks)}, exceed the limit of"
                 f" {self.limit}"
             )
 
-        extractions = []
-        with get_openai_callback() as cb:
-            for _ in range(self.num_of_calls):
-                try:
-                    extractions.extend(self._request(prompt))
-                except Exception as e:
-                    log2cons.exception("Got Extractor Error")
-            self.tkctr += cb.total_tokens
-
-        # remove duplications
-        extractions = list(set(extractions))
+        extractions = Counter()
+        for _ in range(self.num_of_calls):
+            try:
+                # remove duplications so each call votes once
+                extractions.update(set(self._request(prompt)))
+            except (BudgetExceededError, ReplayMissError):
+                raise
+            except Exception as e:
+                log2cons.exception("Got Extractor Error")
 
-        return extractions
+        return dict(extractions)
 
-    def __call__(self, text: str, template: PromptTemplate) -> List[str]:
+    def __call__(self, text: str, template: PromptTemplate) -> Dict[str, int]:
         """request gpt with prompt template and text
 
         Args:
@@ -128,7 +179,7 @@ class Textractor:
             template (PromptTemplate): prompt template with {text} placeholder
 
         Returns:
-            List[str]: list of extracted strings
+            Dict[str, int]: extracted strings with the number of calls agreeing on them
         """
         prompt = template.format(text=text)
         extractions = self.request(prompt)
@@ -0,0 +1,82 @@
+import re
+
+from typing import List
+from dataclasses import dataclass
+
+
+@dataclass
+class Token:
+    text: str
+    start: int
+    end: int
+
+
+# Han and Kana are written without spaces, Hangul is spaced so it stays in words
+CJK = "\u3040-\u30ff\u31f0-\u31ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+# combining marks, variation selectors and zero width joiner stay in their grapheme
+MARKS = "\u0300-\u036f\u1ab0-\u1aff\u20d0-\u20ff\u3099\u309a\ufe00-\ufe0f\u200d"
+
+
+class BaseTokenizer:
+    # joins tokens when comparing phrases
+    sep = " "
+
+    def __init__(self, pattern: str) -> None:
+        self.regex = re.compile(pattern)
+
+    def __call__(self, text: str) -> List[Token]:
+        return [Token(m.group(), m.start(), m.end()) for m in self.regex.finditer(text)]
+
+
+class WhitespaceTokenizer(BaseTokenizer):
+    def __init__(self) -> None:
+        """Split text on whitespace, the same as `str.split`"""
+        super().__init__(r"\S+")
+
+
+class RegexTokenizer(BaseTokenizer):
+    def __init__(self, pattern: str = rf"[\w{MARKS}]+|[^\w\s{MARKS}]+") -> None:
+        """Split text on regex word boundaries, punctuations are separated tokens
+
+        Args:
+            pattern (str, optional): regex of a token. Defaults to runs of word
+                characters or punctuations.
+        """
+        super().__init__(pattern)
+
+
+class CharTokenizer(BaseTokenizer):
+    sep = ""
+
+    def __init__(self) -> None:
+        """Split text into graphemes, i.e. characters with their combining marks"""
+        super().__init__(rf"[^\s{MARKS}][{MARKS}]*")
+
+
+class CJKTokenizer(BaseTokenizer):
+    sep = ""
+
+    def __init__(self) -> None:
+        """Split Chinese and Japanese characters into graphemes and other text into
+        regex words, for unspaced or mixed text
+        """
+        super().__init__(
+            rf"[{CJK}][{MARKS}]*|(?:[^\W{CJK}]|[{MARKS}])+"
+            rf"|[^\w\s{CJK}{MARKS}]+[{MARKS}]*"
+        )
+
+
+tokenizers = {
+    "whitespace": WhitespaceTokenizer,
+    "regex": RegexTokenizer,
+    "char": CharTokenizer,
+    "cjk": CJKTokenizer,
+}
+
+
+def get_tokenizer(name: str) -> BaseTokenizer:
+    if name not in tokenizers:
+        raise ValueError(
+            f"{name} not support, supported tokenizers are {list(tokenizers)}"
+        )
+    return tokenizers[name]()
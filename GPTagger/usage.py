@@ -0,0 +1,202 @@
+import time
+import sqlite3
+import threading
+
+from pathlib import Path
+from contextvars import ContextVar
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Union
+
+from GPTagger.logger import log2cons
+from GPTagger.constants import get_model_info
+
+
+class BudgetExceededError(RuntimeError):
+    pass
+
+
+class UsageLedger:
+    columns = ["tenant", "document", "stage", "model"]
+
+    def __init__(
+        self,
+        path: Union[Path, str] = None,
+        tenant: str = "default",
+        soft_budget: int = None,
+        hard_budget: int = None,
+        throttle: float = 1.0,
+    ) -> None:
+        """Ledger of token usage per tenant, document, stage and model
+
+        Usage is aggregated in a sqlite store, so budgets also count the usage of
+        previous runs sharing the same path.
+
+        Args:
+            path (Union[Path, str], optional): path of the sqlite store, in memory if None. Defaults to None.
+            tenant (str, optional): tenant used outside of `track`. Defaults to "default".
+            soft_budget (int, optional): tokens per tenant before requests are throttled. Defaults to None.
+            hard_budget (int, optional): tokens per tenant before requests are aborted. Defaults to None.
+            throttle (float, optional): seconds to wait per request over the soft budget. Defaults to 1.0.
+        """
+        self.soft_budget = soft_budget
+        self.hard_budget = hard_budget
+        self.throttle = throttle
+
+        self.tenant = ContextVar("tenant", default=tenant)
+        self.document = ContextVar("document", default="")
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path or ":memory:"), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS usage (tenant TEXT, document TEXT, stage TEXT,"
+            " model TEXT, prompt_tokens INTEGER, completion_tokens INTEGER,"
+            " PRIMARY KEY (tenant, document, stage, model))"
+        )
+        self.db.commit()
+
+    @contextmanager
+    def track(self, document: str = None, tenant: str = None):
+        """Attribute the usage within the context to a document and a tenant
+
+        Args:
+            document (str, optional): document name. Defaults to None.
+            tenant (str, optional): tenant name, the ledger tenant if None. Defaults to None.
+        """
+        doc_token = self.document.set(document or "")
+        tenant_token = self.tenant.set(tenant or self.tenant.get())
+        try:
+            yield self
+        finally:
+            self.document.reset(doc_token)
+            self.tenant.reset(tenant_token)
+
+    def total(self, tenant: str = None) -> int:
+        """Total tokens used by a tenant, read from the database so usage recorded by
+        other processes sharing the file counts too
+
+        Args:
+            tenant (str, optional): tenant name, the current tenant if None. Defaults to None.
+
+        Returns:
+            int: prompt and completion tokens
+        """
+        tenant = tenant or self.tenant.get()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT SUM(prompt_tokens + completion_tokens) FROM usage"
+                " WHERE tenant = ?",
+                (tenant,),
+            ).fetchone()
+        return row[0] or 0
+
+    def check(self):
+        """Enforce the budgets of the current tenant before a request"""
+        total = self.total()
+        if self.hard_budget is not None and total >= self.hard_budget:
+            raise BudgetExceededError(
+                f"Tenant {self.tenant.get()} used {total} tokens, exceed the hard"
+                f" budget of {self.hard_budget}"
+            )
+        if self.soft_budget is not None and total >= self.soft_budget:
+            log2cons.warning(
+                "Tenant %s used %d tokens, exceed the soft budget of %d",
+                self.tenant.get(),
+                total,
+                self.soft_budget,
+            )
+            time.sleep(self.throttle)
+
+    def record(
+        self, model: str, stage: str, prompt_tokens: int, completion_tokens: int
+    ):
+        """Record the usage of a request in the current document and tenant
+
+        Args:
+            model (str): model name
+            stage (str): pipeline stage, e.g. extraction or validation
+            prompt_tokens (int): number of prompt tokens
+            completion_tokens (int): number of completion tokens
+        """
+        tenant = self.tenant.get()
+        self.total(tenant)
+
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (tenant, document, stage, model) DO UPDATE SET"
+                " prompt_tokens = prompt_tokens + excluded.prompt_tokens,"
+                " completion_tokens = completion_tokens + excluded.completion_tokens",
+                (
+                    tenant,
+                    self.document.get(),
+                    stage,
+                    model,
+                    prompt_tokens,
+                    completion_tokens,
+                ),
+            )
+            self.db.commit()
+
+    def cost(self, tenant: str = None) -> float:
+        """Total cost of a tenant in USD, based on the prices of the model registry
+
+        Args:
+            tenant (str, optional): tenant name, the current tenant if None. Defaults to None.
+
+        Returns:
+            float: cost in USD
+        """
+        tenant = tenant or self.tenant.get()
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT model, SUM(prompt_tokens), SUM(completion_tokens) FROM usage"
+                " WHERE tenant = ? GROUP BY model",
+                (tenant,),
+            ).fetchall()
+
+        return sum(self._cost(model, pt, ct) for model, pt, ct in rows)
+
+    def _cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        try:
+            info = get_model_info(model)
+        except ValueError:
+            log2cons.warning(
+                "Model %s is not registered, its usage is not priced", model
+            )
+            return 0.0
+        return info.cost(prompt_tokens, completion_tokens)
+
+    def report(self, group_by: Tuple[str, ...] = ("model", "stage")) -> List[Dict]:
+        """Aggregate the usage
+
+        Args:
+            group_by (Tuple[str, ...], optional): columns among [tenant, document, stage, model]. Defaults to ("model", "stage").
+
+        Returns:
+            List[Dict]: usage of each group
+        """
+        for column in group_by:
+            if column not in self.columns:
+                raise ValueError(
+                    f"{column} not support, supported columns are {self.columns}"
+                )
+
+        columns = ", ".join(group_by)
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT {columns}, SUM(prompt_tokens), SUM(completion_tokens)"
+                f" FROM usage GROUP BY {columns} ORDER BY {columns}"
+            ).fetchall()
+
+        keys = [*group_by, "prompt_tokens", "completion_tokens"]
+        reports = [dict(zip(keys, row)) for row in rows]
+
+        if "model" in group_by:
+            for report in reports:
+                report["cost"] = self._cost(
+                    report["model"],
+                    report["prompt_tokens"],
+                    report["completion_tokens"],
+                )
+
+        return reports
@@ -1,4 +1,5 @@
 from GPTagger.validators.gpt import GPTValidator
+from GPTagger.validators.clf import LocalClassifierValidator
 from GPTagger.validators.length import LengthValidator
 from GPTagger.validators.regex import RegexValidator
 from GPTagger.validators.base import BaseValidator
@@ -1,11 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List
 
 
 class BaseValidator(ABC):
+    # costly validators are skipped for confident tags
+    costly = False
+
     def __init__(self) -> None:
         pass
 
     @abstractmethod
     def __call__(self, text: str) -> bool:
         pass
+
+    def batch(self, texts: List[str]) -> List[bool]:
+        return [self(text) for text in texts]
@@ -0,0 +1,86 @@
+import json
+
+from pathlib import Path
+from typing import List, Union
+
+from GPTagger.validators.base import BaseValidator
+
+
+class LocalClassifierValidator(BaseValidator):
+    def __init__(
+        self,
+        log_paths: Union[Path, str, List[Union[Path, str]]],
+        fallback: BaseValidator = None,
+        margin: float = 0.2,
+        ngram_range: tuple = (2, 4),
+    ) -> None:
+        """Validator distilled from the logs of `GPTValidator`, running on CPU
+
+        Char n-gram features are hashed and fed into a logistic regression. Texts
+        with a probability within `margin` of 0.5 are sent to the fallback validator.
+
+        Args:
+            log_paths (Union[Path, str, List[Union[Path, str]]]): jsonl logs written by `GPTValidator`
+            fallback (BaseValidator, optional): validator for uncertain texts, e.g. a `GPTValidator`. Defaults to None.
+            margin (float, optional): uncertainty margin around 0.5. Defaults to 0.2.
+            ngram_range (tuple, optional): range of char n-grams. Defaults to (2, 4).
+        """
+        try:
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.feature_extraction.text import HashingVectorizer
+        except ImportError:
+            raise ImportError(
+                "scikit-learn is required by LocalClassifierValidator, install it with"
+                " `pip install GPTagger[clf]`"
+            )
+
+        self.fallback = fallback
+        self.margin = margin
+
+        texts, labels = self.load_logs(log_paths)
+        if len(set(labels)) < 2:
+            raise ValueError("Logs should contain both accepted and rejected texts")
+
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb", ngram_range=ngram_range, alternate_sign=False
+        )
+        self.clf = LogisticRegression(max_iter=1000)
+        self.clf.fit(self.vectorizer.transform(texts), labels)
+
+    @property
+    def costly(self) -> bool:
+        # uncertain texts cost a round trip of the fallback
+        return self.fallback is not None and self.fallback.costly
+
+    def __call__(self, text: str) -> bool:
+        return self.batch([text])[0]
+
+    def batch(self, texts: List[str]) -> List[bool]:
+        if not texts:
+            return []
+
+        probs = self.clf.predict_proba(self.vectorizer.transform(texts))[:, 1]
+        results = (probs >= 0.5).tolist()
+
+        if self.fallback:
+            uncertain = [i for i, p in enumerate(probs) if abs(p - 0.5) < self.margin]
+            resps = self.fallback.batch([texts[i] for i in uncertain])
+            for i, resp in zip(uncertain, resps):
+                results[i] = resp
+
+        return results
+
+    @staticmethod
+    def load_logs(log_paths: Union[Path, str, List[Union[Path, str]]]) -> tuple:
+        if isinstance(log_paths, (Path, str)):
+            log_paths = [log_paths]
+
+        texts, labels = [], []
+        for path in log_paths:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    log = json.loads(line)
+                    texts.append(log["text"])
+                    labels.append(log["resp"].strip() == "yes")
+
+        return texts, labels
@@ -1,27 +1,31 @@
 import json
-import tiktoken
 
-from langchain.llms import OpenAI
-from langchain.schema import HumanMessage
 from langchain.prompts import PromptTemplate
-from langchain.chat_models import ChatOpenAI
 
+from GPTagger.usage import UsageLedger
 from GPTagger.validators.base import BaseValidator
+from GPTagger.backends import BaseBackend, MeteredBackend, OpenAIBackend
 
 
 class GPTValidator(BaseValidator):
+    costly = True
+
     def __init__(
         self,
         template: PromptTemplate,
         model_name: str = "gpt-3.5-turbo",
         log_path: str = None,
+        backend: BaseBackend = None,
+        ledger: UsageLedger = None,
     ) -> None:
         self.template = template
         self.model_name = model_name
-        self.type = self.get_gpt_type(model_name)
+        self.model = backend or OpenAIBackend(model_name, max_tokens=1)
+        if ledger:
+            self.model = MeteredBackend(self.model, ledger, "validation", model_name)
 
+        # prompt and completion tokens
         self.tkctr = 0
-        self.enc = tiktoken.encoding_for_model("gpt-3.5-turbo")
 
         # This log is only for training clf models
         # Don't use it when u don't need it
@@ -29,7 +33,6 @@ class GPTValidator(BaseValidator):
 
     def __call__(self, text: str) -> bool:
         prompt = self.template.format(text=text)
-        self.tkctr += len(self.enc.encode(prompt))
         resp = self.request_gpt(prompt)
 
         if self.log:
@@ -42,17 +45,6 @@ class GPTValidator(BaseValidator):
             return False
 
     def request_gpt(self, prompt: str) -> str:
-        if self.type == "chat":
-            model = ChatOpenAI(model=self.model_name, max_tokens=1)
-            resp = model.predict_messages([HumanMessage(content=prompt)])
-            return resp.content
-        elif self.type == "comp":
-            model = OpenAI(model=self.model_name, max_tokens=1)
-            resp = model(prompt)
-            return resp
-
-    def get_gpt_type(self, model_name: str) -> str:
-        if "gpt" in model_name:
-            return "chat"
-        else:
-            return "comp"
+        generation = self.model(prompt)
+        self.tkctr += generation.prompt_tokens + generation.completion_tokens
+        return generation.text
@@ -0,0 +1,48 @@
+import json
+
+from typing import List
+
+from GPTagger.backends import BaseBackend, Generation
+
+
+class StubBackend(BaseBackend):
+    def __init__(
+        self,
+        responses: List[str] = ("yes",),
+        model_name: str = "gpt-3.5-turbo",
+        tokens: tuple = (10, 1),
+    ) -> None:
+        """Answer the responses in turn and keep the prompts"""
+        super().__init__(model_name)
+        self.responses = list(responses)
+        self.tokens = tokens
+        self.prompts = []
+
+    @property
+    def ctr(self) -> int:
+        return len(self.prompts)
+
+    def respond(self, prompt: str) -> str:
+        return self.responses[(self.ctr - 1) % len(self.responses)]
+
+    def __call__(self, prompt, functions=None):
+        self.prompts.append(prompt)
+        return Generation(self.respond(prompt), *self.tokens)
+
+
+class CounterBackend(StubBackend):
+    def __init__(self, model_name: str = "counter") -> None:
+        """Answer the prompt with the number of calls"""
+        super().__init__(model_name=model_name, tokens=(1, 1))
+
+    def respond(self, prompt: str) -> str:
+        return f"{prompt}-{self.ctr}"
+
+
+class ExtractionBackend(StubBackend):
+    def __init__(
+        self, responses: List[List[str]], model_name: str = "gpt-3.5-turbo"
+    ) -> None:
+        """Answer the extracted texts of each call in turn"""
+        texts = [json.dumps({"texts": texts}) for texts in responses]
+        super().__init__(texts, model_name, tokens=(10, 2))
@@ -0,0 +1,50 @@
+import pytest
+
+from GPTagger.backends import RecordBackend, ReplayBackend, ReplayMissError
+
+from tests.stubs import CounterBackend
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / "records.jsonl"
+    with RecordBackend(CounterBackend(), path) as backend:
+        backend("a")
+        backend("a")
+        backend("b", functions=[{"name": "process_extractions"}])
+
+    assert backend.file.closed
+
+    replay = ReplayBackend(path)
+
+    assert replay.model_name == "counter"
+    assert replay("a").text == "a-1"
+    assert replay("a").text == "a-2"
+    # start over after the last recorded response
+    assert replay("a").text == "a-1"
+    assert replay("b", functions=[{"name": "process_extractions"}]).text == "b-3"
+
+    with pytest.raises(ReplayMissError):
+        replay("b")
+
+
+def test_replay_models(tmp_path):
+    path = tmp_path / "records.jsonl"
+    RecordBackend(CounterBackend("gpt-4"), path)("a")
+    RecordBackend(CounterBackend("gpt-3.5-turbo"), path)("a")
+
+    with pytest.raises(ValueError):
+        ReplayBackend(path)
+
+    # the same prompt is keyed per model
+    assert ReplayBackend(path, model_name="gpt-4")("a").text == "a-1"
+    assert ReplayBackend(path, model_name="gpt-3.5-turbo")("a").text == "a-1"
+    with pytest.raises(ReplayMissError):
+        ReplayBackend(path, model_name="gpt-4-32k")("a")
+
+
+def test_replay_errors(tmp_path):
+    path = tmp_path / "records.jsonl"
+    RecordBackend(CounterBackend(), path)("a")
+
+    with pytest.raises(RuntimeError):
+        ReplayBackend(path, error_rate=1.0)("a")
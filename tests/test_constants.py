@@ -0,0 +1,20 @@
+import pytest
+
+from GPTagger import constants
+from GPTagger.constants import ModelInfo, get_model_info, register_model
+
+
+def test_dated_model():
+    assert get_model_info("gpt-4-0314") == get_model_info("gpt-4")
+    assert get_model_info("gpt-4-32k-0314") == get_model_info("gpt-4-32k")
+
+
+def test_register_model(monkeypatch):
+    with pytest.raises(ValueError):
+        get_model_info("llama-2-7b")
+
+    # register into a copy so the model does not leak into other tests
+    monkeypatch.setattr(constants, "model_registry", dict(constants.model_registry))
+    register_model("llama-2-7b", ModelInfo(4096, 4096))
+
+    assert get_model_info("llama-2-7b").ctx_len == 4096
@@ -0,0 +1,112 @@
+import json
+
+from langchain.prompts import PromptTemplate
+
+from GPTagger.tag import Tag
+from GPTagger.backends import RecordBackend, ReplayBackend
+from GPTagger.validators import RegexValidator
+from GPTagger.pipelines import NerConfig, NerPipeline
+from GPTagger.evaluation import Scorer, iter_gold, sweep
+
+from tests.stubs import ExtractionBackend
+
+template = PromptTemplate.from_template("Extract the dates.\n{text}")
+
+
+def test_load_xml(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(
+        '<begin id="doc.txt">From <date id="0">1 May</date> to <date id="1">3 May'
+        "</date>.</begin>"
+    )
+
+    fname, text, tags = next(iter_gold(tmp_path))
+
+    assert fname == "doc.txt"
+    assert text == "From 1 May to 3 May."
+    assert tags == [Tag(5, 10, "1 May", "date"), Tag(14, 19, "3 May", "date")]
+
+
+def test_skip_invalid_xml(tmp_path, caplog):
+    (tmp_path / ".DS_Store").write_bytes(b"\x00\x00\x00\x01Bud1")
+    (tmp_path / "notes.txt").write_text("not xml")
+    (tmp_path / "doc.txt").write_text('<begin id="doc.txt">1 May</begin>')
+
+    docs = list(iter_gold(tmp_path))
+
+    assert [fname for fname, _, _ in docs] == ["doc.txt"]
+    assert "notes.txt" in caplog.text
+
+
+def test_load_jsonl(tmp_path):
+    path = tmp_path / "gold.jsonl"
+    tags = [{"start": 5, "end": 10, "label": "date"}]
+    path.write_text(json.dumps({"fname": "a", "text": "From 1 May", "tags": tags}))
+
+    fname, text, tags = next(iter_gold(path))
+
+    assert (fname, text) == ("a", "From 1 May")
+    assert tags == [Tag(5, 10, "1 May", "date")]
+
+
+def test_scorer():
+    scorer = Scorer()
+    gold = [Tag(0, 5, "", "date"), Tag(10, 15, "", "date"), Tag(20, 25, "", "time")]
+    pred = [Tag(0, 5, "", "date"), Tag(12, 18, "", "date"), Tag(30, 35, "", "date")]
+    scorer.update(gold, pred)
+
+    report = scorer.report()
+
+    assert report["date"]["exact"]["precision"] == 1 / 3
+    assert report["date"]["exact"]["recall"] == 1 / 2
+    assert report["date"]["partial"]["precision"] == 2 / 3
+    assert report["date"]["partial"]["recall"] == 1.0
+    assert report["time"]["exact"]["recall"] == 0.0
+    assert report["all"]["partial"]["recall"] == 2 / 3
+
+
+def record(tmp_path):
+    text = "From 1 May to 3 May"
+    gold_path = tmp_path / "gold.jsonl"
+    tags = [{"start": 5, "end": 10, "label": "date"}]
+    tags.append({"start": 14, "end": 19, "label": "date"})
+    gold_path.write_text(json.dumps({"fname": "a", "text": text, "tags": tags}))
+
+    # the second recorded call extracts nothing
+    path = tmp_path / "records.jsonl"
+    backend = RecordBackend(ExtractionBackend([["1 May", "3 May"], []]), path)
+    with backend:
+        NerPipeline("date", nr_calls=2, backend=backend)(text, template)
+
+    return gold_path, path
+
+
+def first_of_may(config, backend):
+    assert isinstance(backend, ReplayBackend)
+    return [RegexValidator("^1 ")]
+
+
+def test_sweep(tmp_path):
+    gold_path, path = record(tmp_path)
+
+    configs = [NerConfig("date", phrase_threshold=t) for t in (80, 85, 90)]
+    results = sweep(configs, template, gold_path, backend=ReplayBackend(path))
+
+    # every config replays the first call
+    for config, report in results:
+        assert report["date"]["exact"]["recall"] == 1.0
+
+
+def test_sweep_validators(tmp_path):
+    gold_path, path = record(tmp_path)
+
+    results = sweep(
+        [NerConfig("date")] * 2,
+        template,
+        gold_path,
+        validators=[None, first_of_may],
+        processes=True,
+        backend=ReplayBackend(path),
+    )
+
+    assert [report["date"]["exact"]["recall"] for _, report in results] == [1.0, 0.5]
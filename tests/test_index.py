@@ -1,6 +1,8 @@
 import json
+import unicodedata
 
 from GPTagger.indexer import Indexer, Tag
+from GPTagger.tokenizers import CJKTokenizer
 
 cases = json.load(open("tests/test_cases/indexer.json"))
 
@@ -75,3 +77,60 @@ def test_overlapping_two():
     assert len(res) == 2
     assert res[0] == Tag(1, 3, "")
     assert res[1] == Tag(4, 5, "")
+
+
+def test_votes_and_ratio():
+    case = cases["bad-first-token"]
+    indexer = Indexer()
+    res = indexer.index({case["input"]: 3}, case["text"], num_of_calls=4)
+
+    assert len(res) == 1
+    assert res[0].votes == 3
+    assert res[0].ratio == 89
+    assert res[0].score == 3 / 4 * 0.89
+
+
+def test_cjk():
+    for name in ["cjk", "cjk-spaced"]:
+        case = cases[name]
+        indexer = Indexer(tokenizer="cjk")
+        res = indexer.index([case["input"]], case["text"])
+
+        assert [tag.text for tag in res] == case["output"]
+
+
+def test_cjk_window_slack():
+    case = cases["cjk-slack"]
+
+    # the phrase has to be as long as the query without slack
+    res = Indexer(tokenizer="cjk").index([case["input"]], case["text"])
+
+    assert [tag.text for tag in res] == ["点在北京开会"]
+
+    indexer = Indexer(tokenizer="cjk", window_slack=1)
+    res = indexer.index([case["input"]], case["text"])
+
+    assert [tag.text for tag in res] == case["output"]
+
+
+def test_token_offsets():
+    # phrases are located on token boundaries, not inside "11 May"
+    res = Indexer().index(["1 May"], "On 11 May and\n1   May")
+
+    assert [(tag.start, tag.end, tag.text) for tag in res] == [(14, 21, "1   May")]
+
+
+def test_cjk_decomposed():
+    # marks of decomposed text stay in their word
+    doc = unicodedata.normalize("NFD", "Tiếng Việt và 東京タワー")
+    tokens = [token.text for token in CJKTokenizer()(doc)]
+
+    assert tokens[:3] == [
+        unicodedata.normalize("NFD", w) for w in ["Tiếng", "Việt", "và"]
+    ]
+    assert tokens[3:] == ["東", "京", "タ", "ワ", "ー"]
+
+    query = unicodedata.normalize("NFD", "Tiếng Việt")
+    res = Indexer(tokenizer="cjk").index([query], doc)
+
+    assert [(tag.start, tag.text) for tag in res] == [(0, query)]
@@ -0,0 +1,77 @@
+from GPTagger.tag import Tag
+from GPTagger.overlap import OverlapResolver, SpanIndex
+
+
+def test_span_index():
+    index = SpanIndex()
+    for tag in [Tag(10, 20, ""), Tag(0, 3, ""), Tag(5, 8, ""), Tag(18, 19, "")]:
+        index.add(tag)
+
+    assert len(index) == 4
+    assert index.overlap(3, 5) == []
+    assert index.overlap(2, 6) == [Tag(0, 3, ""), Tag(5, 8, "")]
+    assert index.overlap(19, 30) == [Tag(10, 20, "")]
+
+
+def test_overlapping_chain():
+    resolver = OverlapResolver()
+
+    # the first and the last tags do not overlap with each other
+    inputs = [Tag(0, 4, ""), Tag(3, 9, ""), Tag(8, 11, "")]
+
+    res = resolver(inputs)
+
+    assert res == [Tag(0, 4, ""), Tag(8, 11, "")]
+
+
+def test_overlapping_longest():
+    resolver = OverlapResolver("longest")
+
+    inputs = [Tag(0, 4, ""), Tag(3, 9, ""), Tag(8, 11, "")]
+
+    assert resolver(inputs) == [Tag(3, 9, "")]
+
+
+def test_overlapping_confidence():
+    resolver = OverlapResolver("confidence")
+
+    inputs = [Tag(0, 4, "", score=0.5), Tag(3, 9, "", score=0.9)]
+
+    assert resolver(inputs) == [Tag(3, 9, "", score=0.9)]
+
+
+def test_overlapping_priority():
+    resolver = OverlapResolver("priority", priorities={"date": 0, "time": 1})
+
+    inputs = [Tag(0, 4, "", "time"), Tag(2, 12, "", "date"), Tag(10, 14, "", "name")]
+
+    assert resolver(inputs) == [Tag(2, 12, "", "date")]
+
+
+def test_overlapping_sparse_priority():
+    resolver = OverlapResolver("priority", priorities={"date": 5, "time": 10})
+
+    inputs = [Tag(0, 10, "", "date"), Tag(2, 4, "", "name"), Tag(8, 12, "")]
+
+    assert resolver(inputs) == [Tag(0, 10, "", "date")]
+
+
+def test_overlapping_by_label():
+    resolver = OverlapResolver(by_label=True)
+
+    inputs = [Tag(0, 4, "", "date"), Tag(2, 12, "", "time"), Tag(1, 3, "", "date")]
+
+    assert resolver(inputs) == [Tag(1, 3, "", "date"), Tag(2, 12, "", "time")]
+
+
+def test_span_index_long_span():
+    index = SpanIndex(load=2)
+    tags = [Tag(i * 10, i * 10 + 5, "") for i in range(100)]
+    for tag in tags + [Tag(3, 507, "long")]:
+        index.add(tag)
+
+    assert index.overlap(506, 508) == [Tag(3, 507, "long")]
+    assert index.overlap(507, 509) == []
+    assert not index.has_overlap(507, 510)
+    assert index.overlap(498, 512) == [Tag(3, 507, "long"), tags[50], tags[51]]
+    assert index.has_overlap(993, 1000)
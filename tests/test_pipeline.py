@@ -0,0 +1,120 @@
+import pytest
+
+from langchain.prompts import PromptTemplate
+
+from GPTagger.backends import RecordBackend, ReplayBackend, ReplayMissError
+from GPTagger.textractor import Textractor
+from GPTagger.evaluation import iter_gold
+from GPTagger.validators import BaseValidator
+from GPTagger.pipelines import NerConfig, NerPipeline
+
+from tests.stubs import ExtractionBackend
+
+template = PromptTemplate.from_template("Extract the dates.\n{text}")
+text = "We met on 1 May and again on 3 May"
+
+
+class RejectValidator(BaseValidator):
+    costly = True
+
+    def __init__(self) -> None:
+        self.texts = []
+
+    def __call__(self, text: str) -> bool:
+        self.texts.append(text)
+        return False
+
+
+def test_votes():
+    backend = ExtractionBackend([["a", "a", "b"], ["a"], ["c"]])
+    textractor = Textractor(num_of_calls=3, backend=backend)
+
+    # duplications within a call only vote once
+    assert textractor.request("prompt") == {"a": 2, "b": 1, "c": 1}
+
+
+class CharEncoder:
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+def test_truncation():
+    # gpt-4 has a context of 8192 tokens
+    with pytest.raises(ValueError):
+        Textractor("gpt-4", max_new_tokens=8190, backend=ExtractionBackend([[]]))
+    # the function definition takes more than the 12 tokens left
+    with pytest.raises(ValueError):
+        Textractor(
+            "gpt-4",
+            max_new_tokens=8180,
+            backend=ExtractionBackend([[]]),
+            encoder=CharEncoder(),
+        )
+
+    backend = ExtractionBackend([[]])
+    textractor = Textractor(
+        "gpt-4", max_new_tokens=7000, backend=backend, encoder=CharEncoder()
+    )
+    textractor.request("a" * 9001)
+
+    assert 0 < textractor.limit < 1192
+    assert len(backend.prompts[0]) <= textractor.limit
+
+
+def test_accept_threshold():
+    backend = ExtractionBackend([["1 May", "3 May"], ["1 May"]])
+    pipeline = NerPipeline("date", nr_calls=2, accept_threshold=0.8, backend=backend)
+    validator = RejectValidator()
+    pipeline.add_validator(validator)
+
+    tags = pipeline(text, template)
+
+    assert [(tag.text, tag.score) for tag in tags] == [("1 May", 1.0)]
+    # only the uncertain tag is sent to the costly validator
+    assert validator.texts == ["3 May"]
+
+
+def test_replay_pipeline(tmp_path):
+    path = tmp_path / "records.jsonl"
+    backend = RecordBackend(ExtractionBackend([["1 May", "3 May"]]), path)
+    NerPipeline("date", backend=backend)(text, template)
+
+    pipeline = NerPipeline("date", backend=ReplayBackend(path))
+    tags = pipeline(text, template)
+
+    assert [tag.text for tag in tags] == ["1 May", "3 May"]
+    assert pipeline.textractor.tkctr == 12
+
+    # cache misses are not scored as empty extractions
+    with pytest.raises(ReplayMissError):
+        pipeline("Another text", template)
+
+
+def test_priority_config():
+    cfg = NerConfig("date", overlap_policy="priority", priorities={"date": 0})
+    pipeline = NerPipeline.from_config(cfg, backend=ExtractionBackend([[]]))
+
+    assert pipeline.indexer.resolver.priorities == {"date": 0}
+
+
+def test_window_config():
+    cfg = NerConfig("date", tokenizer="cjk", window_slack=2, max_window=64)
+    pipeline = NerPipeline.from_config(cfg, backend=ExtractionBackend([[]]))
+
+    assert (pipeline.indexer.window_slack, pipeline.indexer.max_window) == (2, 64)
+
+
+def test_export(tmp_path):
+    text = "1 May and 3 May"
+    backend = ExtractionBackend([["1 May", "3 May"]])
+    pipeline = NerPipeline("date", export_dir=tmp_path, backend=backend)
+    tags = pipeline(text, template, "doc.txt")
+
+    fname, exported_text, exported_tags = next(iter_gold(tmp_path))
+
+    assert (fname, exported_text) == ("doc.txt", text)
+    assert [(tag.start, tag.end) for tag in exported_tags] == [(0, 5), (10, 15)]
+    assert [tag.text for tag in exported_tags] == [tag.text for tag in tags]
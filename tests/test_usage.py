@@ -0,0 +1,96 @@
+import pytest
+
+from GPTagger.usage import BudgetExceededError, UsageLedger
+from GPTagger.backends import MeteredBackend
+
+from tests.stubs import StubBackend
+
+
+def test_report(tmp_path):
+    ledger = UsageLedger(tmp_path / "usage.db")
+    with ledger.track(document="a.txt", tenant="t1"):
+        ledger.record("gpt-4", "extraction", 100, 10)
+        ledger.record("gpt-4", "extraction", 100, 10)
+        ledger.record("gpt-3.5-turbo", "validation", 20, 1)
+    ledger.record("gpt-4", "extraction", 50, 5)
+
+    assert ledger.total("t1") == 241
+    assert ledger.total() == 55
+    assert ledger.report(["tenant", "stage"]) == [
+        {
+            "tenant": "default",
+            "stage": "extraction",
+            "prompt_tokens": 50,
+            "completion_tokens": 5,
+        },
+        {
+            "tenant": "t1",
+            "stage": "extraction",
+            "prompt_tokens": 200,
+            "completion_tokens": 20,
+        },
+        {
+            "tenant": "t1",
+            "stage": "validation",
+            "prompt_tokens": 20,
+            "completion_tokens": 1,
+        },
+    ]
+
+    # usage persists across ledgers
+    assert UsageLedger(tmp_path / "usage.db").total("t1") == 241
+
+
+def test_shared_budget(tmp_path):
+    ledger = UsageLedger(tmp_path / "usage.db", hard_budget=20)
+    ledger.check()
+
+    # another process records to the same file
+    UsageLedger(tmp_path / "usage.db").record("gpt-4", "extraction", 20, 1)
+    with pytest.raises(BudgetExceededError):
+        ledger.check()
+
+
+def test_budgets():
+    ledger = UsageLedger(soft_budget=10, hard_budget=20, throttle=0)
+    ledger.check()
+
+    ledger.record("gpt-4", "extraction", 10, 5)
+    ledger.check()
+
+    ledger.record("gpt-4", "extraction", 10, 5)
+    with pytest.raises(BudgetExceededError):
+        ledger.check()
+
+    # budgets are per tenant
+    with ledger.track(tenant="other"):
+        ledger.check()
+
+
+def test_cost(caplog):
+    ledger = UsageLedger()
+    ledger.record("gpt-4", "extraction", 1000, 500)
+    ledger.record("my-local-model", "extraction", 1000, 500)
+
+    assert ledger.cost() == pytest.approx(0.06)
+    assert ledger.report(["model"])[0]["cost"] == pytest.approx(0.06)
+    # unpriced usage is not hidden
+    assert "my-local-model is not registered" in caplog.text
+
+
+def test_metered_model():
+    ledger = UsageLedger()
+    backend = MeteredBackend(
+        StubBackend(model_name="stub"), ledger, "validation", "gpt-4"
+    )
+    backend("prompt")
+
+    assert ledger.report(["model", "stage"]) == [
+        {
+            "model": "gpt-4",
+            "stage": "validation",
+            "prompt_tokens": 10,
+            "completion_tokens": 1,
+            "cost": pytest.approx(0.00036),
+        }
+    ]
@@ -0,0 +1,58 @@
+import json
+import pytest
+
+from langchain.prompts import PromptTemplate
+
+from GPTagger.validators import BaseValidator, GPTValidator, LocalClassifierValidator
+
+from tests.stubs import StubBackend
+
+pytest.importorskip("sklearn")
+
+
+class CounterValidator(BaseValidator):
+    def __init__(self) -> None:
+        self.ctr = 0
+
+    def __call__(self, text: str) -> bool:
+        self.ctr += 1
+        return True
+
+
+def write_logs(path):
+    dates = [f"{d}.0{m}.2023" for d in range(10, 30) for m in range(1, 10)]
+    words = ["hello", "world", "apple", "banana", "rainy day", "the office"] * 30
+    logs = [{"text": d, "resp": "yes"} for d in dates]
+    logs += [{"text": w, "resp": "no"} for w in words]
+    path.write_text("\n".join(json.dumps(log) for log in logs))
+
+
+def test_local_classifier(tmp_path):
+    path = tmp_path / "gpt.log"
+    write_logs(path)
+    validator = LocalClassifierValidator(path)
+
+    assert validator.batch(["12.03.2024", "banana"]) == [True, False]
+    assert validator("apple") is False
+
+
+def test_local_classifier_fallback(tmp_path):
+    path = tmp_path / "gpt.log"
+    write_logs(path)
+    fallback = CounterValidator()
+    validator = LocalClassifierValidator(path, fallback=fallback, margin=0.5)
+
+    # every text is uncertain within the full margin
+    assert validator.batch(["banana", "hello"]) == [True, True]
+    assert fallback.ctr == 2
+
+
+def test_local_classifier_costly(tmp_path):
+    path = tmp_path / "gpt.log"
+    write_logs(path)
+    template = PromptTemplate.from_template("Is {text} a date?")
+    fallback = GPTValidator(template, backend=StubBackend())
+
+    assert not LocalClassifierValidator(path).costly
+    assert not LocalClassifierValidator(path, fallback=CounterValidator()).costly
+    assert LocalClassifierValidator(path, fallback=fallback).costly